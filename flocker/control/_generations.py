@@ -44,6 +44,10 @@ class GenerationTracker(object):
         version.
     :ivar _latest_object: The most recent version of the object being tracked.
     :ivar _latest_hash: The most recent hash of the object being tracked.
+    :ivar _diff_cache: A ``dict`` mapping generation hashes to the result of
+        ``get_diff_from_hash_to_latest`` for the current latest object.
+        Returning the same ``Diff`` object to every caller with the same
+        starting generation lets the encoding of that ``Diff`` be shared.
     """
 
     def __init__(self, cache_size):
@@ -57,6 +61,7 @@ class GenerationTracker(object):
         self._queue = deque(maxlen=cache_size)
         self._latest_object = None
         self._latest_hash = None
+        self._diff_cache = {}
 
     def get_latest(self):
         """
@@ -99,6 +104,7 @@ class GenerationTracker(object):
 
         self._latest_object = latest
         self._latest_hash = latest_hash
+        self._diff_cache = {}
 
     def get_diff_from_hash_to_latest(self, generation_hash):
         """
@@ -115,17 +121,23 @@ class GenerationTracker(object):
         if generation_hash is None:
             return None
 
-        if self._latest_hash == generation_hash:
-            return compose_diffs([])
-
-        results = []
-        for record in self._queue:
-            if record.generation_hash == generation_hash:
-                results = [record.diff_to_next]
-            elif results:
-                results.append(record.diff_to_next)
+        if generation_hash in self._diff_cache:
+            return self._diff_cache[generation_hash]
 
-        if results:
-            return compose_diffs(results)
+        if self._latest_hash == generation_hash:
+            result = compose_diffs([])
         else:
-            return None
+            results = []
+            for record in self._queue:
+                if record.generation_hash == generation_hash:
+                    results = [record.diff_to_next]
+                elif results:
+                    results.append(record.diff_to_next)
+
+            if results:
+                result = compose_diffs(results)
+            else:
+                result = None
+
+        self._diff_cache[generation_hash] = result
+        return result
@@ -335,7 +335,7 @@ def _cached_dfs_serialize(input_object):
                        _cached_dfs_serialize(value))
                       for key, value in obj.iteritems())
     elif obj_type == list or obj_type == tuple:
-        result = list(_cached_dfs_serialize(x) for x in obj)
+        result = [_cached_dfs_serialize(x) for x in obj]
 
     if is_pyrsistent:
         _cached_dfs_serialize_cache[input_object] = result
@@ -33,7 +33,6 @@ http://eliot.readthedocs.org/en/0.6.0/threads.html).
 
 from collections import defaultdict
 from datetime import timedelta
-from io import BytesIO
 from itertools import count
 from twisted.internet.defer import maybeDeferred
 from uuid import UUID
@@ -101,14 +100,16 @@ class Big(Argument):
         See ``IArgumentType`` for argument and return type documentation.
         """
         self.another_argument.toBox(name, strings, objects, proto)
-        value = BytesIO(strings.pop(name))
-        counter = 0
-        while True:
-            nextChunk = value.read(MAX_VALUE_LENGTH)
-            if not nextChunk:
-                break
-            strings["%s.%d" % (name, counter)] = nextChunk
-            counter += 1
+        value = strings.pop(name)
+        # Slice the serialized value directly rather than reading it through
+        # a ``BytesIO``, which would copy the whole (potentially very large)
+        # value once more before it is chunked.
+        for counter, offset in enumerate(
+                xrange(0, len(value), MAX_VALUE_LENGTH)
+        ):
+            strings["%s.%d" % (name, counter)] = (
+                value[offset:offset + MAX_VALUE_LENGTH]
+            )
 
     def fromBox(self, name, strings, objects, proto):
         """
@@ -121,14 +122,16 @@ class Big(Argument):
 
         See ``IArgumentType`` for argument and return type documentation.
         """
-
-        value = BytesIO()
+        chunks = []
         for counter in count(0):
             chunk = strings.get("%s.%d" % (name, counter))
             if chunk is None:
                 break
-            value.write(chunk)
-            strings[name] = value.getvalue()
+            chunks.append(chunk)
+        if chunks:
+            # Join once at the end; re-assembling the value after every chunk
+            # is quadratic in the number of chunks.
+            strings[name] = b"".join(chunks)
         self.another_argument.fromBox(name, strings, objects, proto)
 
 
@@ -168,20 +171,30 @@ class SerializableArgument(Argument):
         """
         Argument.__init__(self)
         self._expected_classes = classes
+        self._expected_types = frozenset(classes)
 
-    def fromString(self, in_bytes):
-        obj = wire_decode(in_bytes)
-        if not isinstance(obj, self._expected_classes):
+    def _check_type(self, obj):
+        """
+        :raise TypeError: If ``obj`` is not an instance of any of the expected
+            classes.
+        """
+        # The same exact-type fast path as ``generation_hash`` and
+        # ``_cached_dfs_serialize`` in ``_persistence``.  It only helps
+        # objects whose type is exactly one of the expected classes; a
+        # subclass pays for the set lookup as well as the ``isinstance``.
+        if (type(obj) not in self._expected_types and
+                not isinstance(obj, self._expected_classes)):
             raise TypeError(
                 "{} is none of {}".format(obj, self._expected_classes)
             )
+
+    def fromString(self, in_bytes):
+        obj = wire_decode(in_bytes)
+        self._check_type(obj)
         return obj
 
     def toString(self, obj):
-        if not isinstance(obj, self._expected_classes):
-            raise TypeError(
-                "{} is none of {}".format(obj, self._expected_classes)
-            )
+        self._check_type(obj)
         return caching_wire_encode(obj)
 
 
@@ -729,12 +742,22 @@ class ControlAMPService(Service):
                 action.add_success_fields(
                     configuration=configuration, state=state
                 )
+                # Set the configuration and the state to the latest versions
+                # once for the whole batch rather than once per connection.
+                # Every configuration change and state change made since the
+                # last batch is folded into this one update.  It is okay to
+                # call this even if the latest configuration is the same
+                # object.
+                self._configuration_generation_tracker.insert_latest(
+                    configuration
+                )
+                self._state_generation_tracker.insert_latest(state)
             else:
                 # Eliot wants those fields though.
                 action.add_success_fields(configuration=None, state=None)
 
             for connection in can_update:
-                self._update_connection(connection, configuration, state)
+                self._update_connection(connection)
 
             for connection in elided_update:
                 AGENT_UPDATE_ELIDED(agent=connection).write()
@@ -742,20 +765,16 @@ class ControlAMPService(Service):
             for connection in delayed_update:
                 self._delayed_update_connection(connection)
 
-    def _update_connection(self, connection, configuration, state):
+    def _update_connection(self, connection):
         """
         Send the latest cluster configuration and state to ``connection``.
 
+        The latest configuration and state are those most recently inserted
+        into the generation trackers.
+
         :param ControlAMP connection: The connection to use to send the
             command.
         """
-
-        # Set the configuration and the state to the latest versions. It is
-        # okay to call this even if the latest configuration is the same
-        # object.
-        self._configuration_generation_tracker.insert_latest(configuration)
-        self._state_generation_tracker.insert_latest(state)
-
         action = LOG_SEND_TO_AGENT(agent=connection)
         with action.context():
 
@@ -903,7 +922,7 @@ class ControlAMPService(Service):
         :param connections: An iterable of connections that will be passed to
             ``_send_state_to_connections``.
         """
-        self._connections_pending_update.update(set(connections))
+        self._connections_pending_update.update(connections)
 
         # If there is no current pending update and there are connections
         # pending an update, we must schedule the delayed call to update
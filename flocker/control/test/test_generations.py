@@ -99,3 +99,29 @@ class GenerationTrackerTests(TestCase):
             missing_diff,
             Is(None)
         )
+
+    def test_diff_shared_between_callers(self):
+        """
+        Repeated calls to ``get_diff_from_hash_to_latest`` with the same
+        generation hash return the same ``Diff`` object until a new latest
+        object is inserted.
+        """
+        deployments = related_deployments_strategy(3).example()
+        tracker_under_test = GenerationTracker(4)
+        for d in deployments:
+            tracker_under_test.insert_latest(d)
+
+        start_hash = make_generation_hash(deployments[0])
+        diff = tracker_under_test.get_diff_from_hash_to_latest(start_hash)
+        same_diff = tracker_under_test.get_diff_from_hash_to_latest(
+            start_hash)
+
+        tracker_under_test.insert_latest(deployments[1])
+        new_diff = tracker_under_test.get_diff_from_hash_to_latest(
+            start_hash)
+
+        self.assertThat(
+            (same_diff, new_diff.apply(deployments[0])),
+            Equals((diff, deployments[1]))
+        )
+        self.assertThat(same_diff, Is(diff))
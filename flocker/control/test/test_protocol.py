@@ -12,9 +12,11 @@ from zope.interface.verify import verifyObject
 
 from characteristic import attributes, Attribute
 
+from pyrsistent import pmap
+
 from eliot import ActionType, start_action, MemoryLogger, Logger
 from eliot.testing import (
-    capture_logging, validate_logging, assertHasAction,
+    capture_logging, validate_logging, assertHasAction, LoggedAction,
 )
 
 from twisted.internet.error import ConnectionDone
@@ -50,6 +52,7 @@ from .. import (
     Deployment, Application, DockerImage, Node, NodeState, Manifestation,
     Dataset, DeploymentState, NonManifestDatasets,
 )
+from .. import _protocol
 from .._persistence import wire_encode, make_generation_hash
 from .._diffing import create_diff
 from .clusterstatetools import advance_some, advance_rest
@@ -98,6 +101,20 @@ APP2 = Application(
 _TEST_DEPLOYMENT = Deployment(nodes=frozenset([
     Node(hostname=u'node1.example.com',
          applications={a.name: a for a in [APP1, APP2]})]))
+# Hashed once here since many tests compare against it.
+_TEST_DEPLOYMENT_GENERATION = make_generation_hash(_TEST_DEPLOYMENT)
+
+# Successive changes to ``_TEST_DEPLOYMENT``.  These are immutable so they can
+# be shared by all the tests which just need some different configurations.
+_MODIFIED_TEST_DEPLOYMENT = arbitrary_transformation(_TEST_DEPLOYMENT)
+_TWICE_MODIFIED_TEST_DEPLOYMENT = arbitrary_transformation(
+    _MODIFIED_TEST_DEPLOYMENT
+)
+
+# Long enough for any pending batched update from the control service to be
+# sent.
+_TWO_BATCH_DELAYS = CONTROL_SERVICE_BATCHING_DELAY * 2
+
 MANIFESTATION = Manifestation(dataset=Dataset(dataset_id=unicode(uuid4())),
                               primary=True)
 
@@ -109,6 +126,19 @@ MANIFESTATION = Manifestation(dataset=Dataset(dataset_id=unicode(uuid4())),
 #
 _MANY_CONTAINERS = 800
 
+# The applications used by ``huge_node``.  Built once and then shared, since
+# they are immutable and building them dominates the cost of the tests which
+# use them.  Deriving each application from a prototype with ``set`` only
+# checks the changed field, rather than every field of a newly constructed
+# ``Application``.
+_HUGE_APPLICATION_PROTOTYPE = Application(
+    name=u'postgres-0', image=DockerImage.from_string(u'postgresql'),
+)
+_HUGE_APPLICATIONS = pmap({
+    name: _HUGE_APPLICATION_PROTOTYPE.set(name=name)
+    for name in (u'postgres-{}'.format(i) for i in range(_MANY_CONTAINERS))
+})
+
 
 def huge_node(node_prototype):
     """
@@ -120,15 +150,7 @@ def huge_node(node_prototype):
     :return: An object like ``node_prototype`` but with its applications
         replaced by a large collection of applications.
     """
-    image = DockerImage.from_string(u'postgresql')
-    applications = {
-        a.name: a
-        for a in [
-            Application(name=u'postgres-{}'.format(i), image=image)
-            for i in range(_MANY_CONTAINERS)
-        ]
-    }
-    return node_prototype.set(applications=applications)
+    return node_prototype.set(applications=_HUGE_APPLICATIONS)
 
 
 def _huge(deployment_prototype, node_prototype):
@@ -148,13 +170,23 @@ def _huge(deployment_prototype, node_prototype):
     )
 
 
+# The results of ``huge_deployment`` and ``huge_state``.  Like
+# ``_HUGE_APPLICATIONS`` these are immutable, so they are built once and then
+# shared.
+_HUGE_DEPLOYMENT = _huge(Deployment(), Node(hostname=u'192.0.2.31'))
+_HUGE_STATE = _huge(
+    DeploymentState(),
+    NodeState(hostname=u'192.0.2.31', applications={}),
+)
+
+
 def huge_deployment():
     """
     Return a configuration with many containers.
 
     :rtype: ``Deployment``
     """
-    return _huge(Deployment(), Node(hostname=u'192.0.2.31'))
+    return _HUGE_DEPLOYMENT
 
 
 def huge_state():
@@ -163,10 +195,7 @@ def huge_state():
 
     :rtype: ``DeploymentState``
     """
-    return _huge(
-        DeploymentState(),
-        NodeState(hostname=u'192.0.2.31', applications={}),
-    )
+    return _HUGE_STATE
 
 
 # A very simple piece of node state that makes for nice-looking, easily-read
@@ -188,6 +217,9 @@ NONMANIFEST = NonManifestDatasets(
 )
 del dataset
 
+# Some bytes several times larger than MAX_VALUE_LENGTH.
+_BIG_BYTES = b"\n".join(b"%d" % value for value in range(MAX_VALUE_LENGTH))
+
 
 class BigArgumentTests(TestCase):
     """
@@ -261,13 +293,23 @@ class BigArgumentTests(TestCase):
         ``Big`` can serialize and unserialize argmuments which are larger than
         MAX_VALUE_LENGTH.
         """
-        big_bytes = u"\n".join(
-            u"{value}".format(value=value)
-            for value
-            in range(MAX_VALUE_LENGTH)
-        ).encode("ascii")
+        self.assert_roundtrips(self.CommandWithBigArgument, big=_BIG_BYTES)
 
-        self.assert_roundtrips(self.CommandWithBigArgument, big=big_bytes)
+    def test_chunks(self):
+        """
+        ``Big.toBox`` splits a large value into consecutively indexed chunks
+        no longer than MAX_VALUE_LENGTH.
+        """
+        big = dict(self.CommandWithBigArgument.arguments)["big"]
+        value = b"x" * (MAX_VALUE_LENGTH * 2 + 1)
+        strings = {}
+        big.toBox(b"big", strings, {b"big": value}, None)
+        self.assertEqual(
+            {b"big.0": MAX_VALUE_LENGTH,
+             b"big.1": MAX_VALUE_LENGTH,
+             b"big.2": 1},
+            {key: len(chunk) for key, chunk in strings.items()},
+        )
 
     def test_two_big_arguments(self):
         """
@@ -336,14 +378,8 @@ class SerializationTests(TestCase):
         """
         argument = SerializableArgument(NodeState, Deployment)
         objects = [_TEST_DEPLOYMENT, NODE_STATE]
-        serialized = list(
-            argument.toString(o)
-            for o in objects
-        )
-        unserialized = list(
-            argument.fromString(s)
-            for s in serialized
-        )
+        serialized = [argument.toString(o) for o in objects]
+        unserialized = [argument.fromString(s) for s in serialized]
         self.assertEqual(objects, unserialized)
 
     def test_wrong_type_serialization(self):
@@ -395,21 +431,37 @@ class ControlTestCase(TestCase):
             a ``ControlAMP`` instance.
         """
 
-        def capture_call_remote(capture, *args, **kwargs):
+        def capture_call_remote(*args, **kwargs):
             # Ditch the eliot context whose context level is difficult to
             # predict.
             kwargs.pop('eliot_context')
-            capture.append((args, kwargs))
+            capture_list.append((args, kwargs))
             return succeed(None)
 
         # Patching is bad.
         # https://clusterhq.atlassian.net/browse/FLOC-1603
-        self.patch(
-            protocol,
-            "callRemote",
-            lambda *args, **kwargs: capture_call_remote(
-                capture_list, *args, **kwargs)
-        )
+        self.patch(protocol, "callRemote", capture_call_remote)
+
+    def agents_and_servers(self, count):
+        """
+        Create some fake agents and the in-memory AMP clients a control
+        service can use to send them commands.
+
+        The agents' protocols all share a single ``Clock`` rather than each
+        getting their own, since the tests never advance it.
+
+        :param int count: The number of agents to create.
+
+        :return: A ``tuple`` of a ``list`` of ``FakeAgent`` instances and a
+            ``list`` of the corresponding ``LoopbackAMPClient`` instances.
+        """
+        agent_reactor = Clock()
+        agents = [FakeAgent() for _ in range(count)]
+        servers = [
+            LoopbackAMPClient(AgentAMP(agent_reactor, agent).locator)
+            for agent in agents
+        ]
+        return agents, servers
 
 
 class ControlAMPTests(ControlTestCase):
@@ -448,15 +500,13 @@ class ControlAMPTests(ControlTestCase):
         self.control_amp_service.cluster_state.apply_changes([NODE_STATE])
 
         self.protocol.makeConnection(StringTransportWithAbort())
-        self.reactor.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
+        self.reactor.advance(_TWO_BATCH_DELAYS)
         cluster_state = self.control_amp_service.cluster_state.as_deployment()
         self.assertEqual(
             sent[0],
             (((ClusterStatusCommand,),
               dict(configuration=_TEST_DEPLOYMENT,
-                   configuration_generation=make_generation_hash(
-                       _TEST_DEPLOYMENT
-                   ),
+                   configuration_generation=_TEST_DEPLOYMENT_GENERATION,
                    state=cluster_state,
                    state_generation=make_generation_hash(cluster_state)))))
 
@@ -549,30 +599,28 @@ class ControlAMPTests(ControlTestCase):
         """
         self.control_amp_service.configuration_service.save(_TEST_DEPLOYMENT)
 
-        agents = [FakeAgent(), FakeAgent()]
-        clients = list(AgentAMP(Clock(), agent) for agent in agents)
-        servers = list(LoopbackAMPClient(client.locator) for client in clients)
+        agents, servers = self.agents_and_servers(2)
 
         for server in servers:
             delayed = DelayedAMPClient(server)
             self.control_amp_service.connected(delayed)
-            self.reactor.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
+            self.reactor.advance(_TWO_BATCH_DELAYS)
             delayed.respond()
 
         self.successResultOf(
             self.client.callRemote(NodeStateCommand,
                                    state_changes=(NODE_STATE,),
                                    eliot_context=TEST_ACTION))
-        self.reactor.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
+        self.reactor.advance(_TWO_BATCH_DELAYS)
 
         cluster_state = self.control_amp_service.cluster_state.as_deployment()
         expected = dict(configuration=_TEST_DEPLOYMENT, state=cluster_state)
         self.assertEqual(
             [expected] * len(agents),
-            list(
+            [
                 dict(configuration=agent.desired, state=agent.actual)
                 for agent in agents
-            ),
+            ],
         )
 
     def test_nodestate_coalesces_multiple_quick(self):
@@ -582,25 +630,21 @@ class ControlAMPTests(ControlTestCase):
         """
         self.control_amp_service.configuration_service.save(_TEST_DEPLOYMENT)
 
-        agents = [FakeAgent(), FakeAgent()]
-        clients = list(AgentAMP(Clock(), agent) for agent in agents)
-        servers = list(LoopbackAMPClient(client.locator) for client in clients)
+        agents, servers = self.agents_and_servers(2)
 
         for server in servers:
             self.control_amp_service.connected(server)
 
-        initial_update_counts = list(
-            agent.cluster_updated_count for agent in agents)
-
-        for i in xrange(10):
-            new_application_name = u'app-%d' % i
-            new_state = NODE_STATE.set(
-                'applications',
-                NODE_STATE.applications.set(
-                    new_application_name,
-                    Application(name=new_application_name,
-                                image=DockerImage.from_string('image-%d' % i))
-                )
+        initial_update_counts = cluster_updated_counts(agents)
+
+        new_applications = [
+            Application(name=u'app-%d' % i,
+                        image=DockerImage.from_string('image-%d' % i))
+            for i in xrange(10)
+        ]
+        for application in new_applications:
+            new_state = NODE_STATE.transform(
+                ['applications', application.name], application,
             )
             self.successResultOf(
                 self.client.callRemote(
@@ -615,20 +659,14 @@ class ControlAMPTests(ControlTestCase):
         # CONTROL_SERVICE_BATCHING_DELAY before they are sent out.
         self.assertEqual(
             [0] * len(agents),
-            list(
-                agent.cluster_updated_count - c
-                for agent, c in zip(agents, initial_update_counts)
-            ),
+            updates_since(agents, initial_update_counts),
         )
-        self.reactor.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
+        self.reactor.advance(_TWO_BATCH_DELAYS)
 
         # Now we expect only 1 update to be sent to each of the agents.
         self.assertEqual(
             [1] * len(agents),
-            list(
-                agent.cluster_updated_count - c
-                for agent, c in zip(agents, initial_update_counts)
-            ),
+            updates_since(agents, initial_update_counts),
         )
 
     def test_too_long_node_state(self):
@@ -728,7 +766,7 @@ class ControlAMPServiceTests(ControlTestCase):
         initial_update_counts = agent.cluster_updated_count
         service.configuration_service.save(_TEST_DEPLOYMENT)
         service.stopService()
-        service_clock.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
+        service_clock.advance(_TWO_BATCH_DELAYS)
 
         # Even though we waited the delay, the stopping of the service should
         # have cancelled the callback.
@@ -767,7 +805,7 @@ class ControlAMPServiceTests(ControlTestCase):
         service.connected(server)
 
         service.configuration_service.save(_TEST_DEPLOYMENT)
-        service_clock.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
+        service_clock.advance(_TWO_BATCH_DELAYS)
 
         self.assertEqual(
             dict(configuration=_TEST_DEPLOYMENT, state=DeploymentState()),
@@ -795,47 +833,69 @@ class ControlAMPServiceTests(ControlTestCase):
         self.assertEqual(
             agent.cluster_updated_count - initial_updates_count, 0
         )
-        service_clock.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
+        service_clock.advance(_TWO_BATCH_DELAYS)
         self.assertEqual(
             agent.cluster_updated_count - initial_updates_count, 1
         )
 
+    def test_single_scheduled_update(self):
+        """
+        Connections and configuration changes occurring within
+        ``CONTROL_SERVICE_BATCHING_DELAY`` of each other all share a single
+        scheduled update.
+        """
+        agents, servers = self.agents_and_servers(2)
+        service_clock = Clock()
+        service = build_control_amp_service(self, service_clock)
+        service.startService()
+
+        for server in servers:
+            service.connected(server)
+        for _ in xrange(3):
+            service.configuration_service.save(
+                arbitrary_transformation(_TEST_DEPLOYMENT)
+            )
+
+        self.assertEqual(
+            1,
+            len([
+                call for call in service_clock.getDelayedCalls()
+                if call.func == service._execute_update_connections
+            ])
+        )
+
     def test_coalesce_delayed_updates(self):
         """
         If multiple clients still haven't acknowledged an update when a
         broadcast is done, then they should just queue their update for the
         next batch rather than immediately sending a response.
         """
-        agents = list(FakeAgent() for _ in xrange(10))
-        clients = list(AgentAMP(Clock(), agent) for agent in agents)
+        agents, servers = self.agents_and_servers(10)
         service_clock = Clock()
         service = build_control_amp_service(self, service_clock)
         service.startService()
 
-        servers = list(LoopbackAMPClient(client.locator) for client in clients)
-        delayed_servers = list(
-            DelayedAMPClient(server) for server in servers)
+        delayed_servers = [DelayedAMPClient(server) for server in servers]
 
         for server in delayed_servers:
             service.connected(server)
-        service_clock.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
-        (server.respond() for server in delayed_servers)
+        service_clock.advance(_TWO_BATCH_DELAYS)
+        for server in delayed_servers:
+            server.respond()
 
         configuration = service.configuration_service.get()
 
         # Update configuration:
         service.configuration_service.save(
             arbitrary_transformation(configuration))
-        service_clock.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
+        service_clock.advance(_TWO_BATCH_DELAYS)
 
         # Before any of the nodes respond, update configuration again
         final_configuration = arbitrary_transformation(configuration)
         service.configuration_service.save(final_configuration)
-        service_clock.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
+        service_clock.advance(_TWO_BATCH_DELAYS)
 
-        initial_update_counts = list(
-            agent.cluster_updated_count for agent in agents
-        )
+        initial_update_counts = cluster_updated_counts(agents)
 
         for server in delayed_servers:
             server.respond()
@@ -846,28 +906,35 @@ class ControlAMPServiceTests(ControlTestCase):
         # has passed, even for these delayed updates.
         self.assertEqual(
             [0] * len(agents),
-            list(
-                agent.cluster_updated_count - c
-                for agent, c in zip(agents, initial_update_counts)
-            )
+            updates_since(agents, initial_update_counts)
         )
-        service_clock.pump([CONTROL_SERVICE_BATCHING_DELAY*2]*10)
+        # A single advance is enough: the delayed updates are all sent by the
+        # one batched call scheduled by the responses above.
+        service_clock.advance(_TWO_BATCH_DELAYS)
         self.assertEqual(
             [1] * len(agents),
-            list(
-                agent.cluster_updated_count - c
-                for agent, c in zip(agents, initial_update_counts)
-            )
+            updates_since(agents, initial_update_counts)
         )
         self.assertEqual(
             [final_configuration] * len(agents),
-            list(agent.desired for agent in agents)
+            [agent.desired for agent in agents]
         )
 
-    def test_second_configuration_change_waits_for_first_acknowledgement(self):
+    def _begin_delayed_scenario(self, failing_confounder=False):
         """
-        A second configuration change is only transmitted after acknowledgement
-        of the first configuration change is received.
+        Start a control service with two agents connected to it and send
+        the first configuration update to one of them over a connection which
+        only responds when told to.
+
+        :param bool failing_confounder: If ``True``, the other agent's
+            connection raises an exception for every command sent over it.
+            Otherwise the other agent's connection works normally.
+
+        :return: A ``tuple`` of the ``ControlAMPService``, the ``Clock`` it
+            uses, the ``DelayedAMPClient`` for the connection to the agent
+            under test, the ``FakeAgent`` under test, the configuration
+            originally sent to it and a modified version of that
+            configuration which has not been saved yet.
         """
         agent = FakeAgent()
         client = AgentAMP(Clock(), agent)
@@ -880,8 +947,20 @@ class ControlAMPServiceTests(ControlTestCase):
         confounding_agent = FakeAgent()
         confounding_client = AgentAMP(Clock(), confounding_agent)
         confounding_server = LoopbackAMPClient(confounding_client.locator)
+
+        if failing_confounder:
+            def raise_unexpected_exception(self,
+                                           commandType=None,
+                                           *a, **kw):
+                raise Exception("I'm an unexpected exception")
+
+            # We want the update to fail in one of the connections
+            self.patch(confounding_server,
+                       "callRemote",
+                       raise_unexpected_exception
+                       )
         service.connected(confounding_server)
-        service_clock.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
+        service_clock.advance(_TWO_BATCH_DELAYS)
 
         configuration = service.configuration_service.get()
         modified_configuration = arbitrary_transformation(configuration)
@@ -890,16 +969,31 @@ class ControlAMPServiceTests(ControlTestCase):
         delayed_server = DelayedAMPClient(server)
         # Send first update
         service.connected(delayed_server)
-        service_clock.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
+        service_clock.advance(_TWO_BATCH_DELAYS)
+
+        return (
+            service, service_clock, delayed_server, agent,
+            configuration, modified_configuration,
+        )
+
+    def test_second_configuration_change_waits_for_first_acknowledgement(self):
+        """
+        A second configuration change is only transmitted after acknowledgement
+        of the first configuration change is received.
+        """
+        (service, service_clock, delayed_server, agent,
+         configuration, modified_configuration) = (
+            self._begin_delayed_scenario()
+        )
         first_agent_desired = agent.desired
 
         # Send second update
         service.configuration_service.save(modified_configuration)
-        service_clock.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
+        service_clock.advance(_TWO_BATCH_DELAYS)
         second_agent_desired = agent.desired
 
         delayed_server.respond()
-        service_clock.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
+        service_clock.advance(_TWO_BATCH_DELAYS)
         third_agent_desired = agent.desired
 
         self.assertEqual(
@@ -920,51 +1014,21 @@ class ControlAMPServiceTests(ControlTestCase):
         If the first update fails, we want to ensure that following updates
         won't get stuck waiting, and will get updated.
         """
-        agent = FakeAgent()
-        client = AgentAMP(Clock(), agent)
-        service_clock = Clock()
-        service = build_control_amp_service(self, service_clock)
-        service.startService()
-
-        # Add a second agent, to ensure that the delayed logic interacts with
-        # the correct connection.
-        confounding_agent = FakeAgent()
-        confounding_client = AgentAMP(Clock(), confounding_agent)
-
-        # Setup of the the server that will fail to update
-        failing_server = LoopbackAMPClient(confounding_client.locator)
-
-        def raise_unexpected_exception(self,
-                                       commandType=None,
-                                       *a, **kw):
-            raise Exception("I'm an unexpected exception")
-
-        # We want the update to fail in one of the connections
-        self.patch(failing_server,
-                   "callRemote",
-                   raise_unexpected_exception
-                   )
-        # The connection will fail, but it shouldn't prevent following
-        # commnads (from ``delayed_server``) to be properly executed
-        service.connected(failing_server)
-        service_clock.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
-
-        configuration = service.configuration_service.get()
-        modified_configuration = arbitrary_transformation(configuration)
-
-        server = LoopbackAMPClient(client.locator)
-        delayed_server = DelayedAMPClient(server)
-        # Send first update
-        service.connected(delayed_server)
-        service_clock.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
+        # The update to the other agent fails, but that shouldn't prevent
+        # following commands (from ``delayed_server``) from being properly
+        # executed.
+        (service, service_clock, delayed_server, agent,
+         configuration, modified_configuration) = (
+            self._begin_delayed_scenario(failing_confounder=True)
+        )
 
         # Send second update
         service.configuration_service.save(modified_configuration)
-        service_clock.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
+        service_clock.advance(_TWO_BATCH_DELAYS)
         second_agent_desired = agent.desired
 
         delayed_server.respond()
-        service_clock.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
+        service_clock.advance(_TWO_BATCH_DELAYS)
         third_agent_desired = agent.desired
 
         # Now we verify that the updates following the failure
@@ -986,44 +1050,25 @@ class ControlAMPServiceTests(ControlTestCase):
         A third configuration change completely replaces a second configuration
         change if the first configuration change has not yet been acknowledged.
         """
-        agent = FakeAgent()
-        client = AgentAMP(Clock(), agent)
-        service_clock = Clock()
-        service = build_control_amp_service(self, service_clock)
-        service.startService()
-
-        # Add a second agent, to ensure that the delayed logic interacts with
-        # the correct connection.
-        confounding_agent = FakeAgent()
-        confounding_client = AgentAMP(Clock(), confounding_agent)
-        confounding_server = LoopbackAMPClient(confounding_client.locator)
-        service.connected(confounding_server)
-        service_clock.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
-
-        configuration = service.configuration_service.get()
-        modified_configuration = arbitrary_transformation(configuration)
+        (service, service_clock, delayed_server, agent,
+         configuration, modified_configuration) = (
+            self._begin_delayed_scenario()
+        )
         more_modified_configuration = arbitrary_transformation(
             modified_configuration
         )
 
-        server = LoopbackAMPClient(client.locator)
-        delayed_server = DelayedAMPClient(server)
-
-        # Send first update
-        service.connected(delayed_server)
-        service_clock.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
-
         # Send second update
         service.configuration_service.save(modified_configuration)
-        service_clock.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
+        service_clock.advance(_TWO_BATCH_DELAYS)
 
         # Send third update
         service.configuration_service.save(more_modified_configuration)
-        service_clock.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
+        service_clock.advance(_TWO_BATCH_DELAYS)
 
         first_agent_desired = agent.desired
         delayed_server.respond()
-        service_clock.advance(CONTROL_SERVICE_BATCHING_DELAY*2)
+        service_clock.advance(_TWO_BATCH_DELAYS)
         second_agent_desired = agent.desired
         delayed_server.respond()
         third_agent_desired = agent.desired
@@ -1042,18 +1087,26 @@ class ControlAMPServiceTests(ControlTestCase):
         )
 
 
+# The attributes of ``FakeAgent``, which are also its ``__slots__``.
+_FAKE_AGENT_FIELDS = (
+    Attribute("is_connected", default_value=False),
+    Attribute("is_disconnected", default_value=False),
+    Attribute("cluster_updated_count", default_value=0),
+    Attribute("desired", default_value=None),
+    Attribute("actual", default_value=None),
+    Attribute("client", default_value=None),
+    Attribute("logger", default_factory=Logger,
+              exclude_from_cmp=True, exclude_from_repr=True),
+)
+
+
 @implementer(IConvergenceAgent)
-@attributes([Attribute("is_connected", default_value=False),
-             Attribute("is_disconnected", default_value=False),
-             Attribute("cluster_updated_count", default_value=0),
-             Attribute("desired", default_value=None),
-             Attribute("actual", default_value=None),
-             Attribute("client", default_value=None)])
+@attributes(_FAKE_AGENT_FIELDS)
 class FakeAgent(object):
     """
     Fake agent for testing.
     """
-    logger = Logger()
+    __slots__ = tuple(field.name for field in _FAKE_AGENT_FIELDS)
 
     def connected(self, client):
         self.is_connected = True
@@ -1069,6 +1122,60 @@ class FakeAgent(object):
         self.cluster_updated_count += 1
 
 
+def cluster_updated_counts(agents):
+    """
+    :param agents: A ``list`` of ``FakeAgent`` instances.
+
+    :return: A ``list`` of the number of cluster updates each agent has
+        received so far.
+    """
+    return [agent.cluster_updated_count for agent in agents]
+
+
+def updates_since(agents, initial_counts):
+    """
+    :param agents: A ``list`` of ``FakeAgent`` instances.
+    :param initial_counts: A ``list`` previously returned by
+        ``cluster_updated_counts`` for ``agents``.
+
+    :return: A ``list`` of the number of cluster updates each agent has
+        received since ``initial_counts`` was taken.
+    """
+    current_counts = cluster_updated_counts(agents)
+    return [
+        after - before
+        for after, before in zip(current_counts, initial_counts)
+    ]
+
+
+def agent_state(agent):
+    """
+    :param FakeAgent agent: An agent.
+
+    :return: A ``dict`` of the attributes ``FakeAgent`` instances are
+        compared on.
+    """
+    return {
+        attribute.name: getattr(agent, attribute.name)
+        for attribute in FakeAgent.characteristic_attributes
+        if not attribute.exclude_from_cmp
+    }
+
+
+_INITIAL_AGENT_STATE = agent_state(FakeAgent())
+
+
+def expected_agent_state(**kwargs):
+    """
+    :param kwargs: Values for any of the attributes returned by
+        ``agent_state``.
+
+    :return: A ``dict`` like those returned by ``agent_state``, describing a
+        new ``FakeAgent`` with ``kwargs`` applied.
+    """
+    return dict(_INITIAL_AGENT_STATE, **kwargs)
+
+
 TEST_ACTION = start_action(MemoryLogger(), 'test:action')
 
 
@@ -1092,26 +1199,43 @@ class AgentClientTests(TestCase):
         The agent does not get told a connection was made or lost before it's
         actually happened.
         """
-        self.agent = FakeAgent()
-        self.reactor = Clock()
-        self.client = AgentAMP(self.reactor, self.agent)
-        self.assertEqual(self.agent, FakeAgent(is_connected=False,
-                                               is_disconnected=False))
+        # The agent created by ``setUp`` has already been connected, so this
+        # needs one of its own.  The reactor can be shared since it is never
+        # advanced.
+        agent = FakeAgent()
+        AgentAMP(self.reactor, agent)
+        self.assertEqual(
+            agent_state(agent),
+            expected_agent_state(
+                is_connected=False,
+                is_disconnected=False,
+            ),
+        )
 
     def test_connection_made(self):
         """
         Connection made events are passed on to the agent.
         """
-        self.assertEqual(self.agent, FakeAgent(is_connected=True,
-                                               client=self.client))
+        self.assertEqual(
+            agent_state(self.agent),
+            expected_agent_state(
+                is_connected=True,
+                client=self.client,
+            ),
+        )
 
     def test_connection_lost(self):
         """
         Connection lost events are passed on to the agent.
         """
         self.client.connectionLost(Failure(ConnectionLost()))
-        self.assertEqual(self.agent, FakeAgent(is_connected=True,
-                                               is_disconnected=True))
+        self.assertEqual(
+            agent_state(self.agent),
+            expected_agent_state(
+                is_connected=True,
+                is_disconnected=True,
+            ),
+        )
 
     def test_too_long_configuration(self):
         """
@@ -1203,19 +1327,22 @@ class AgentClientTests(TestCase):
         self.assertEqual(
             self.successResultOf(d),
             dict(
-                current_configuration_generation=make_generation_hash(
-                    _TEST_DEPLOYMENT
-                ),
+                current_configuration_generation=_TEST_DEPLOYMENT_GENERATION,
                 current_state_generation=make_generation_hash(
                     actual
                 ),
             )
         )
-        self.assertEqual(self.agent, FakeAgent(is_connected=True,
-                                               client=self.client,
-                                               desired=_TEST_DEPLOYMENT,
-                                               cluster_updated_count=1,
-                                               actual=actual))
+        self.assertEqual(
+            agent_state(self.agent),
+            expected_agent_state(
+                is_connected=True,
+                client=self.client,
+                desired=_TEST_DEPLOYMENT,
+                cluster_updated_count=1,
+                actual=actual,
+            ),
+        )
 
     def test_cluster_updated_diff(self):
         """
@@ -1225,7 +1352,7 @@ class AgentClientTests(TestCase):
         actual = DeploymentState(nodes=[])
         d = self._send_cluster_status(_TEST_DEPLOYMENT, actual)
         self.successResultOf(d)
-        next_deployment = arbitrary_transformation(_TEST_DEPLOYMENT)
+        next_deployment = _MODIFIED_TEST_DEPLOYMENT
         next_state = arbitrary_state_transformation(actual)
         d = self._send_cluster_status_diff(
             _TEST_DEPLOYMENT, actual, next_deployment, next_state
@@ -1241,11 +1368,16 @@ class AgentClientTests(TestCase):
                 ),
             )
         )
-        self.assertEqual(self.agent, FakeAgent(is_connected=True,
-                                               client=self.client,
-                                               desired=next_deployment,
-                                               cluster_updated_count=2,
-                                               actual=next_state))
+        self.assertEqual(
+            agent_state(self.agent),
+            expected_agent_state(
+                is_connected=True,
+                client=self.client,
+                desired=next_deployment,
+                cluster_updated_count=2,
+                actual=next_state,
+            ),
+        )
 
     def test_cluster_updated_diff_wrong_initial(self):
         """
@@ -1256,10 +1388,10 @@ class AgentClientTests(TestCase):
         actual = DeploymentState(nodes=[])
         d = self._send_cluster_status(_TEST_DEPLOYMENT, actual)
         self.successResultOf(d)
-        next_deployment = arbitrary_transformation(_TEST_DEPLOYMENT)
-        wrong_initial_deployment = arbitrary_transformation(next_deployment)
+        next_deployment = _MODIFIED_TEST_DEPLOYMENT
+        wrong_initial_deployment = _TWICE_MODIFIED_TEST_DEPLOYMENT
         next_state = arbitrary_state_transformation(actual)
-        wrong_initial_state = arbitrary_transformation(next_deployment)
+        wrong_initial_state = _TWICE_MODIFIED_TEST_DEPLOYMENT
         d = self._send_cluster_status_diff(
             wrong_initial_deployment, actual, next_deployment, next_state
         )
@@ -1269,20 +1401,23 @@ class AgentClientTests(TestCase):
         self.assertEqual(
             self.successResultOf(d),
             dict(
-                current_configuration_generation=make_generation_hash(
-                    _TEST_DEPLOYMENT
-                ),
+                current_configuration_generation=_TEST_DEPLOYMENT_GENERATION,
                 current_state_generation=make_generation_hash(
                     actual
                 ),
             )
         )
         # Agent still has the initial configuration.
-        self.assertEqual(self.agent, FakeAgent(is_connected=True,
-                                               client=self.client,
-                                               desired=_TEST_DEPLOYMENT,
-                                               cluster_updated_count=1,
-                                               actual=actual))
+        self.assertEqual(
+            agent_state(self.agent),
+            expected_agent_state(
+                is_connected=True,
+                client=self.client,
+                desired=_TEST_DEPLOYMENT,
+                cluster_updated_count=1,
+                actual=actual,
+            ),
+        )
 
         d = self._send_cluster_status_diff(
             _TEST_DEPLOYMENT, wrong_initial_state, next_deployment, next_state
@@ -1292,20 +1427,23 @@ class AgentClientTests(TestCase):
         self.assertEqual(
             self.successResultOf(d),
             dict(
-                current_configuration_generation=make_generation_hash(
-                    _TEST_DEPLOYMENT
-                ),
+                current_configuration_generation=_TEST_DEPLOYMENT_GENERATION,
                 current_state_generation=make_generation_hash(
                     actual
                 ),
             )
         )
         # Agent still has the initial configuration.
-        self.assertEqual(self.agent, FakeAgent(is_connected=True,
-                                               client=self.client,
-                                               desired=_TEST_DEPLOYMENT,
-                                               cluster_updated_count=1,
-                                               actual=actual))
+        self.assertEqual(
+            agent_state(self.agent),
+            expected_agent_state(
+                is_connected=True,
+                client=self.client,
+                desired=_TEST_DEPLOYMENT,
+                cluster_updated_count=1,
+                actual=actual,
+            ),
+        )
 
         d = self._send_cluster_status_diff(
             _TEST_DEPLOYMENT, actual, next_deployment, next_state
@@ -1321,11 +1459,16 @@ class AgentClientTests(TestCase):
                 ),
             )
         )
-        self.assertEqual(self.agent, FakeAgent(is_connected=True,
-                                               client=self.client,
-                                               desired=next_deployment,
-                                               cluster_updated_count=2,
-                                               actual=next_state))
+        self.assertEqual(
+            agent_state(self.agent),
+            expected_agent_state(
+                is_connected=True,
+                client=self.client,
+                desired=next_deployment,
+                cluster_updated_count=2,
+                actual=next_state,
+            ),
+        )
 
 
 def iconvergence_agent_tests_factory(fixture):
@@ -1416,10 +1559,10 @@ class ClusterStatusCommandTests(TestCase):
         """
         ClusterStatusCommand requires the following arguments.
         """
-        self.assertItemsEqual(
-            ['configuration', 'configuration_generation', 'state',
-             'state_generation', 'eliot_context'],
-            (v[0] for v in ClusterStatusCommand.arguments))
+        self.assertEqual(
+            sorted(['configuration', 'configuration_generation', 'state',
+                    'state_generation', 'eliot_context']),
+            sorted(v[0] for v in ClusterStatusCommand.arguments))
 
 
 class ClusterStatusDiffCommandTests(TestCase):
@@ -1430,12 +1573,12 @@ class ClusterStatusDiffCommandTests(TestCase):
         """
         ClusterStatusDiffCommand requires the following arguments.
         """
-        self.assertItemsEqual(
-            ['configuration_diff', 'start_configuration_generation',
-             'end_configuration_generation', 'state_diff',
-             'start_state_generation', 'end_state_generation',
-             'eliot_context'],
-            (v[0] for v in ClusterStatusDiffCommand.arguments))
+        self.assertEqual(
+            sorted(['configuration_diff', 'start_configuration_generation',
+                    'end_configuration_generation', 'state_diff',
+                    'start_state_generation', 'end_state_generation',
+                    'eliot_context']),
+            sorted(v[0] for v in ClusterStatusDiffCommand.arguments))
 
 
 class AgentLocatorTests(TestCase):
@@ -1480,7 +1623,7 @@ class ControlServiceLocatorTests(TestCase):
         self.assertIs(logger, locator.logger)
 
 
-class SendStateToConnectionsTests(TestCase):
+class SendStateToConnectionsTests(ControlTestCase):
     """
     Tests for ``ControlAMPService._send_state_to_connections``.
     """
@@ -1521,6 +1664,59 @@ class SendStateToConnectionsTests(TestCase):
             startFields={"agent": server},
         )
 
+    @capture_logging(None)
+    def test_logging_many_connections(self, logger):
+        """
+        ``_send_state_to_connections`` logs a single LOG_SEND_CLUSTER_STATE
+        action however many connections it sends to, with a LOG_SEND_TO_AGENT
+        action for each of those connections.
+        """
+        control_amp_service = build_control_amp_service(self)
+        agents, servers = self.agents_and_servers(3)
+        for server in servers:
+            control_amp_service.connected(server)
+        control_amp_service._send_state_to_connections(connections=servers)
+
+        self.assertEqual(
+            (1, servers),
+            (len(LoggedAction.of_type(logger.messages,
+                                      LOG_SEND_CLUSTER_STATE)),
+             [action.start_message["agent"] for action in
+              LoggedAction.of_type(logger.messages, LOG_SEND_TO_AGENT)]),
+        )
+
+    def test_encodes_once(self):
+        """
+        ``_send_state_to_connections`` encodes the configuration and state
+        once regardless of how many connections they are sent to.
+        """
+        encoded = []
+
+        def counting_wire_encode(obj):
+            encoded.append(obj)
+            return wire_encode(obj)
+        self.patch(_protocol, "wire_encode", counting_wire_encode)
+
+        control_amp_service = build_control_amp_service(self)
+        agents, servers = self.agents_and_servers(3)
+        for server in servers:
+            control_amp_service.connected(server)
+        # Use objects which cannot already be in the encoding cache.
+        configuration = arbitrary_transformation(_TEST_DEPLOYMENT)
+        control_amp_service.configuration_service.save(configuration)
+        control_amp_service.cluster_state.apply_changes([
+            SIMPLE_NODE_STATE.set(uuid=uuid4()),
+        ])
+        state = control_amp_service.cluster_state.as_deployment()
+
+        control_amp_service._send_state_to_connections(connections=servers)
+
+        self.assertEqual(
+            (1, 1),
+            (len([o for o in encoded if o is configuration]),
+             len([o for o in encoded if o is state])),
+        )
+
 
 class _NoOpCounter(CommandLocator):
     noops = 0
@@ -1535,20 +1731,39 @@ class PingTestsMixin(object):
     """
     Mixin for ``TestCase`` defining tests for an ``AMP`` protocol that
     periodically sends no-op ping messages.
+
+    :ivar reactor: The ``Clock`` used by ``protocol``.
+    :ivar protocol: The protocol under test, as built by ``build_protocol``.
     """
+    def setUp(self):
+        super(PingTestsMixin, self).setUp()
+        self.reactor = Clock()
+        self.protocol = self.build_protocol(self.reactor)
+
+    def connect_noop_counter(self):
+        """
+        Connect ``protocol`` to an ``AMP`` peer which counts the ``NoOp``
+        commands it receives.
+
+        :return: A ``tuple`` of the peer, its ``_NoOpCounter`` locator and the
+            ``IOPump`` connecting it to ``protocol``.
+        """
+        locator = _NoOpCounter()
+        peer = AMP(locator=locator)
+        pump = connectedServerAndClient(
+            lambda: self.protocol, lambda: peer
+        )[2]
+        return peer, locator, pump
+
     def test_periodic_noops(self):
         """
         When connected, the protocol sends ``NoOp`` commands at a fixed
         interval.
         """
         expected_pings = 3
-        reactor = Clock()
-        locator = _NoOpCounter()
-        peer = AMP(locator=locator)
-        protocol = self.build_protocol(reactor)
-        pump = connectedServerAndClient(lambda: protocol, lambda: peer)[2]
+        peer, locator, pump = self.connect_noop_counter()
         for i in range(expected_pings):
-            reactor.advance(PING_INTERVAL.total_seconds())
+            self.reactor.advance(PING_INTERVAL.total_seconds())
             peer.callRemote(NoOp)  # Keep the other side alive past its timeout
             pump.flush()
         self.assertEqual(locator.noops, expected_pings)
@@ -1558,55 +1773,49 @@ class PingTestsMixin(object):
         When the protocol loses its connection, it stops trying to send
         ``NoOp`` commands.
         """
-        reactor = Clock()
-        protocol = self.build_protocol(reactor)
         transport = StringTransportWithAbort()
-        protocol.makeConnection(transport)
+        self.protocol.makeConnection(transport)
         transport.clear()
-        protocol.connectionLost(Failure(ConnectionDone("test, simulated")))
-        reactor.advance(PING_INTERVAL.total_seconds())
+        self.protocol.connectionLost(
+            Failure(ConnectionDone("test, simulated"))
+        )
+        self.reactor.advance(PING_INTERVAL.total_seconds())
         self.assertEqual(b"", transport.value())
 
     def test_timeout_cancelled_on_lost_connection(self):
         """
         The ping timeout is cancelled if the remote connection is lost.
         """
-        reactor = Clock()
-        protocol = self.build_protocol(reactor)
         transport = StringTransportWithAbort()
-        protocol.makeConnection(transport)
-        protocol.connectionLost(
+        self.protocol.makeConnection(transport)
+        self.protocol.connectionLost(
             Failure(ConnectionDone("test, simulated"))
         )
-        reactor.advance(PING_INTERVAL.total_seconds() * 3)
+        self.reactor.advance(PING_INTERVAL.total_seconds() * 3)
 
     def test_timeout_reset_on_ping_activity(self):
         """
         The AMP connection remains open when communication is received at
         any time up to the timeout limit.
         """
-        reactor = Clock()
-        protocol = self.build_protocol(reactor)
-        locator = _NoOpCounter()
-        peer = AMP(locator=locator)
-        pump = connectedServerAndClient(lambda: protocol, lambda: peer)[2]
+        peer, locator, pump = self.connect_noop_counter()
         # The timer started the moment the protocol was instantiated.
         # A moment before the timer expires the protocol is still connected
         # (not disconnecting).
-        reactor.advance(2 * PING_INTERVAL.total_seconds() - 0.1)
-        initially_aborted = protocol.transport.disconnecting
+        self.reactor.advance(2 * PING_INTERVAL.total_seconds() - 0.1)
+        initially_aborted = self.protocol.transport.disconnecting
         # If at this point the peer pings us, it resets the timer.
         peer.callRemote(NoOp)
         pump.flush()
         # And we can advance to the original expiry time without triggering
         # abortConnection.
-        reactor.advance(0.1)
-        later_aborted = protocol.transport.disconnecting
+        self.reactor.advance(0.1)
+        later_aborted = self.protocol.transport.disconnecting
         # But if we now advance to the expiry timeout (the ping occured at
         # expiry - 0.1s, without a ping, then abortConnection is called and the
         # connection begins disconnecting.
-        reactor.advance(2 * PING_INTERVAL.total_seconds() - 0.1)
-        finally_aborted = protocol.transport.disconnecting
+        self.reactor.advance(2 * PING_INTERVAL.total_seconds() - 0.1)
+        finally_aborted = self.protocol.transport.disconnecting
         self.assertEqual(
             dict(initially=initially_aborted,
                  later=later_aborted,
@@ -1617,7 +1826,7 @@ class PingTestsMixin(object):
         )
 
 
-class ControlAMPPingTests(TestCase, PingTestsMixin):
+class ControlAMPPingTests(PingTestsMixin, TestCase):
     """
     Tests for pinging done by ``ControlAMP``.
     """
@@ -1628,7 +1837,7 @@ class ControlAMPPingTests(TestCase, PingTestsMixin):
         return ControlAMP(reactor, control_amp_service)
 
 
-class AgentAMPPingTests(TestCase, PingTestsMixin):
+class AgentAMPPingTests(PingTestsMixin, TestCase):
     """
     Tests for pinging done by ``AgentAMP``.
     """
@@ -4,6 +4,8 @@
 """
 A loopback implementation of the ``IBlockDeviceAPI`` for testing.
 """
+from fcntl import ioctl
+from os import O_RDONLY, close, open as os_open
 from uuid import UUID, uuid4
 from subprocess import check_output
 
@@ -110,19 +112,82 @@ def _losetup_list_parse(output):
     return devices
 
 
+# Where the kernel describes block devices, including the backing files of
+# loopback devices.
+_SYS_BLOCK = FilePath(b"/sys/block")
+
+
+def _losetup_list_sysfs(sys_block):
+    """
+    List the loopback devices which have a backing file by reading what the
+    kernel publishes about them in sysfs.
+
+    :param FilePath sys_block: The sysfs directory describing the block
+        devices on the system.
+    :returns: A ``list`` of
+        2-tuple(FilePath(device_file), FilePath(backing_file))
+    """
+    devices = []
+    for device in sys_block.children():
+        name = device.basename()
+        if not name.startswith(b"loop"):
+            continue
+        try:
+            backing_file = device.descendant(
+                [b"loop", b"backing_file"]
+            ).getContent()
+        except IOError:
+            # Loopback devices without a backing file have no ``loop``
+            # directory.
+            continue
+        backing_file = backing_file.rstrip(b"\n")
+        # The kernel marks backing files which have since been deleted.
+        deleted_suffix = b" (deleted)"
+        if backing_file.endswith(deleted_suffix):
+            backing_file = backing_file[:-len(deleted_suffix)]
+        devices.append(
+            (FilePath(b"/dev").child(name), FilePath(backing_file))
+        )
+    return devices
+
+
 def _losetup_list():
     """
     List all the loopback devices on the system.
 
+    The list is read from sysfs where that is available, to avoid running
+    ``losetup`` every time.
+
     :returns: A ``list`` of
         2-tuple(FilePath(device_file), FilePath(backing_file))
     """
+    if _SYS_BLOCK.isdir():
+        return _losetup_list_sysfs(_SYS_BLOCK)
     output = check_output(
         ["losetup", "--all"]
     ).decode('utf8')
     return _losetup_list_parse(output)
 
 
+# The ioctl request which disassociates a loopback device from its backing
+# file.  See loop(4).
+_LOOP_CLR_FD = 0x4C01
+
+
+def _losetup_detach(device_file):
+    """
+    Release a loopback device from its backing file, as ``losetup --detach``
+    does, without running ``losetup``.
+
+    :param FilePath device_file: The loopback device to release.
+    """
+    fd = os_open(device_file.path, O_RDONLY)
+    try:
+        ioctl(fd, _LOOP_CLR_FD)
+    finally:
+        close(fd)
+
+
 def _device_for_path(expected_backing_file):
     """
     :param FilePath backing_file: A path which may be associated with a
@@ -339,12 +404,10 @@ class LoopbackBlockDeviceAPI(object):
         if volume.attached_to is None:
             raise UnattachedVolume(blockdevice_id)
 
-        # ``losetup --detach`` only if the file was used for a loop device.
-        if self.get_device_path(blockdevice_id) is not None:
-            check_output([
-                b"losetup", b"--detach",
-                self.get_device_path(blockdevice_id).path
-            ])
+        # Release the loop device only if the file was used for one.
+        device_path = self.get_device_path(blockdevice_id)
+        if device_path is not None:
+            _losetup_detach(device_path)
 
         filename = _backing_file_name(volume)
         volume_path = self._attached_directory.descendant([
@@ -4,8 +4,10 @@
 Tests for ``flocker.node.agents.blockdevice``.
 """
 
+import time
 from errno import ENOTDIR
 from functools import partial
+from os import stat
 from uuid import UUID, uuid4
 from subprocess import check_output, check_call
 from stat import S_IRWXU
@@ -87,7 +89,7 @@ from ..blockdevice import (
 
 from ..loopback import (
     LoopbackBlockDeviceAPI,
-    _losetup_list_parse,
+    _losetup_list_parse, _losetup_list_sysfs,
     _losetup_list, _blockdevicevolume_from_dataset_id,
     _backing_file_name,
     EventuallyConsistentBlockDeviceAPI,
@@ -140,6 +142,10 @@ EMPTY_NODE_STATE = NodeState(uuid=uuid4(), hostname=u"example.com")
 ARBITRARY_BLOCKDEVICE_ID = u'blockdevice_id_1'
 ARBITRARY_BLOCKDEVICE_ID_2 = u'blockdevice_id_2'
 
+# ``REALISTIC_BLOCKDEVICE_SIZE`` as the integer number of bytes used for
+# volume and dataset sizes.
+REALISTIC_BLOCKDEVICE_SIZE_BYTES = int(REALISTIC_BLOCKDEVICE_SIZE.to_Byte())
+
 # Eliot is transitioning away from the "Logger instances all over the place"
 # approach. So just use this global logger for now.
 _logger = Logger()
@@ -244,11 +250,12 @@ def get_size_info(api, volume):
     backing_file = api._root_path.descendant(
         ['unattached', _backing_file_name(volume)]
     )
+    # Both sizes come from a single stat of the file.
+    stat_result = stat(backing_file.path)
     # Get actual number of 512 byte blocks used by the file.  See
     # http://stackoverflow.com/a/3212102
-    backing_file.restat()
-    actual = backing_file.statinfo.st_blocks * 512
-    reported = backing_file.getsize()
+    actual = stat_result.st_blocks * 512
+    reported = stat_result.st_size
     return _SizeInfo(actual=actual, reported=reported)
 
 
@@ -340,10 +347,11 @@ def delete_manifestation(node_state, manifestation):
     Remove all traces of a ``Manifestation`` from a ``NodeState``.
     """
     dataset_id = manifestation.dataset.dataset_id
-    node_state = node_state.transform(['manifestations', dataset_id], discard)
-    node_state = node_state.transform(['paths', dataset_id], discard)
-    node_state = node_state.transform(['devices', UUID(dataset_id)], discard)
-    return node_state
+    return node_state.transform(
+        ['manifestations', dataset_id], discard,
+        ['paths', dataset_id], discard,
+        ['devices', UUID(dataset_id)], discard,
+    )
 
 
 class BlockDeviceDeployerLocalStateTests(TestCase):
@@ -1934,7 +1942,7 @@ class ScenarioMixin(object):
     MANIFESTATION = Manifestation(
         dataset=Dataset(
             dataset_id=unicode(DATASET_ID),
-            maximum_size=int(REALISTIC_BLOCKDEVICE_SIZE.to_Byte()),
+            maximum_size=REALISTIC_BLOCKDEVICE_SIZE_BYTES,
         ),
         primary=True,
     )
@@ -1957,19 +1965,22 @@ class ScenarioMixin(object):
         applications=None,
     )
 
+    # The configuration corresponding to ``ONE_DATASET_STATE``.
+    ONE_DATASET_CONFIG = to_node(ONE_DATASET_STATE)
+
     MOUNT_ROOT = FilePath('/flocker')
     MOUNTED_DISCOVERED_DATASET = DiscoveredDataset(
         dataset_id=DATASET_ID,
         blockdevice_id=BLOCKDEVICE_ID,
         state=DatasetStates.MOUNTED,
-        maximum_size=int(REALISTIC_BLOCKDEVICE_SIZE.bytes),
+        maximum_size=REALISTIC_BLOCKDEVICE_SIZE_BYTES,
         device_path=FilePath('/dev/xvdf'),
         mount_point=MOUNT_ROOT,
     )
     MOUNTED_DESIRED_DATASET = DesiredDataset(
         state=DatasetStates.MOUNTED,
         dataset_id=DATASET_ID,
-        maximum_size=int(REALISTIC_BLOCKDEVICE_SIZE.bytes),
+        maximum_size=REALISTIC_BLOCKDEVICE_SIZE_BYTES,
         mount_point=MOUNT_ROOT.child(
             unicode(DATASET_ID)
         ),
@@ -2008,7 +2019,7 @@ def create_test_blockdevice_volume_for_dataset_id(dataset_id,
 
     return BlockDeviceVolume(
         blockdevice_id=_create_blockdevice_id_for_test(dataset_id),
-        size=int(REALISTIC_BLOCKDEVICE_SIZE.to_Byte()),
+        size=REALISTIC_BLOCKDEVICE_SIZE_BYTES,
         attached_to=attached_to,
         dataset_id=UUID(dataset_id))
 
@@ -2111,7 +2122,7 @@ class BlockDeviceDeployerAlreadyConvergedCalculateChangesTests(
         the local state is already converged with the desired configuration.
         """
         local_state = self.ONE_DATASET_STATE
-        local_config = to_node(local_state)
+        local_config = self.ONE_DATASET_CONFIG
 
         assert_calculated_changes(
             self, local_state, local_config, set(),
@@ -2132,7 +2143,7 @@ class BlockDeviceDeployerAlreadyConvergedCalculateChangesTests(
             ["paths", unicode(self.DATASET_ID)], discard,
         )
 
-        local_config = to_node(self.ONE_DATASET_STATE).transform(
+        local_config = self.ONE_DATASET_CONFIG.transform(
             ["manifestations", unicode(self.DATASET_ID), "dataset"],
             lambda d: d.set(
                 # Mark it as deleted in the configuration.
@@ -2187,7 +2198,7 @@ class BlockDeviceDeployerIgnorantCalculateChangesTests(
         to calculate state for the current node.
         """
         local_state = self.ONE_DATASET_STATE
-        local_config = to_node(local_state).transform(
+        local_config = self.ONE_DATASET_CONFIG.transform(
             ["manifestations", unicode(self.DATASET_ID), "dataset", "deleted"],
             True
         )
@@ -2217,7 +2228,7 @@ class BlockDeviceDeployerDestructionCalculateChangesTests(
         a ``UnmountBlockDevice`` state change operation.
         """
         local_state = self.ONE_DATASET_STATE
-        local_config = to_node(local_state).transform(
+        local_config = self.ONE_DATASET_CONFIG.transform(
             ["manifestations", unicode(self.DATASET_ID), "dataset", "deleted"],
             True
         )
@@ -2232,7 +2243,7 @@ class BlockDeviceDeployerDestructionCalculateChangesTests(
                     state=DatasetStates.MOUNTED,
                     dataset_id=self.DATASET_ID,
                     blockdevice_id=self.BLOCKDEVICE_ID,
-                    maximum_size=int(REALISTIC_BLOCKDEVICE_SIZE.to_Byte()),
+                    maximum_size=REALISTIC_BLOCKDEVICE_SIZE_BYTES,
                     device_path=FilePath(b"/dev/sda"),
                     mount_point=FilePath(b"/flocker").child(
                         bytes(self.DATASET_ID),
@@ -2254,7 +2265,7 @@ class BlockDeviceDeployerDestructionCalculateChangesTests(
             ["paths"], {},
             ["devices"], {},
         )
-        local_config = to_node(self.ONE_DATASET_STATE).transform(
+        local_config = self.ONE_DATASET_CONFIG.transform(
             ["manifestations", unicode(self.DATASET_ID), "dataset", "deleted"],
             True
         )
@@ -2271,7 +2282,7 @@ class BlockDeviceDeployerDestructionCalculateChangesTests(
                     state=DatasetStates.NON_MANIFEST,
                     dataset_id=self.DATASET_ID,
                     blockdevice_id=self.BLOCKDEVICE_ID,
-                    maximum_size=int(REALISTIC_BLOCKDEVICE_SIZE.to_Byte()),
+                    maximum_size=REALISTIC_BLOCKDEVICE_SIZE_BYTES,
                 ),
             ],
         )
@@ -2289,7 +2300,7 @@ class BlockDeviceDeployerDestructionCalculateChangesTests(
             nodes={node_state}
         )
 
-        node_config = to_node(node_state).transform(
+        node_config = self.ONE_DATASET_CONFIG.transform(
             ["manifestations", unicode(self.DATASET_ID), "dataset", "deleted"],
             True
         )
@@ -2336,7 +2347,7 @@ class BlockDeviceDeployerDestructionCalculateChangesTests(
         local_state = add_application_with_volume(self.ONE_DATASET_STATE)
 
         # Dataset is deleted:
-        local_config = to_node(self.ONE_DATASET_STATE).transform(
+        local_config = self.ONE_DATASET_CONFIG.transform(
             ["manifestations", unicode(self.DATASET_ID), "dataset", "deleted"],
             True)
         local_config = add_application_with_volume(local_config)
@@ -2357,7 +2368,7 @@ class BlockDeviceDeployerDestructionCalculateChangesTests(
                                   self.ONE_DATASET_STATE.uuid)
 
         # Dataset is deleted:
-        local_config = to_node(self.ONE_DATASET_STATE).transform(
+        local_config = self.ONE_DATASET_CONFIG.transform(
             ["manifestations", unicode(self.DATASET_ID), "dataset", "deleted"],
             True)
         local_config = add_application_with_volume(local_config)
@@ -2375,18 +2386,14 @@ class BlockDeviceDeployerDestructionCalculateChangesTests(
         ``UnmountBlockDevice`` state change operation.
         """
         local_state = self.ONE_DATASET_STATE
-        local_config = to_node(local_state).transform(
+        local_config = self.ONE_DATASET_CONFIG.transform(
             ["manifestations", unicode(self.DATASET_ID), "dataset", "deleted"],
             True
         )
         # Remove the manifestation and its mount path.
         local_state = local_state.transform(
-            ['manifestations', unicode(self.DATASET_ID)],
-            discard
-        )
-        local_state = local_state.transform(
-            ['paths', unicode(self.DATASET_ID)],
-            discard
+            ['manifestations', unicode(self.DATASET_ID)], discard,
+            ['paths', unicode(self.DATASET_ID)], discard,
         )
         # Local state shows that there is a device for the (now) non-manifest
         # dataset. i.e it is attached.
@@ -2414,7 +2421,7 @@ class BlockDeviceDeployerDestructionCalculateChangesTests(
                     dataset_id=self.DATASET_ID,
                     blockdevice_id=_create_blockdevice_id_for_test(
                         self.DATASET_ID),
-                    maximum_size=int(REALISTIC_BLOCKDEVICE_SIZE.to_Byte()),
+                    maximum_size=REALISTIC_BLOCKDEVICE_SIZE_BYTES,
                     device_path=FilePath(b"/dev/sda"),
                 ),
             ],
@@ -2430,18 +2437,14 @@ class BlockDeviceDeployerDestructionCalculateChangesTests(
         state change operation.
         """
         local_state = self.ONE_DATASET_STATE
-        local_config = to_node(local_state).transform(
+        local_config = self.ONE_DATASET_CONFIG.transform(
             ["manifestations", unicode(self.DATASET_ID), "dataset", "deleted"],
             True
         )
         # Remove the manifestation and its mount path.
         local_state = local_state.transform(
-            ['manifestations', unicode(self.DATASET_ID)],
-            discard
-        )
-        local_state = local_state.transform(
-            ['paths', unicode(self.DATASET_ID)],
-            discard
+            ['manifestations', unicode(self.DATASET_ID)], discard,
+            ['paths', unicode(self.DATASET_ID)], discard,
         )
         device = FilePath(b"/dev/sda")
 
@@ -2471,7 +2474,7 @@ class BlockDeviceDeployerDestructionCalculateChangesTests(
                     dataset_id=self.DATASET_ID,
                     blockdevice_id=_create_blockdevice_id_for_test(
                         self.DATASET_ID),
-                    maximum_size=int(REALISTIC_BLOCKDEVICE_SIZE.to_Byte()),
+                    maximum_size=REALISTIC_BLOCKDEVICE_SIZE_BYTES,
                     device_path=device,
                 ),
             ],
@@ -2498,14 +2501,13 @@ class BlockDeviceDeployerAttachCalculateChangesTests(
         )
         # Give it a configuration that says a dataset should have a
         # manifestation on the deployer's node.
-        node_config = to_node(self.ONE_DATASET_STATE)
+        node_config = self.ONE_DATASET_CONFIG
         cluster_config = Deployment(nodes={node_config})
 
         # Give the node an empty state.
         node_state = self.ONE_DATASET_STATE.transform(
-            ["manifestations", unicode(self.DATASET_ID)], discard
-        ).transform(
-            ["devices", self.DATASET_ID], discard
+            ["manifestations", unicode(self.DATASET_ID)], discard,
+            ["devices", self.DATASET_ID], discard,
         )
 
         # Take the dataset in the configuration and make it part of the
@@ -2562,7 +2564,7 @@ class BlockDeviceDeployerMountCalculateChangesTests(
         )
 
         # Give it a configuration that says there should be a manifestation.
-        node_config = to_node(self.ONE_DATASET_STATE)
+        node_config = self.ONE_DATASET_CONFIG
 
         assert_calculated_changes(
             self, node_state, node_config,
@@ -2615,7 +2617,7 @@ class BlockDeviceDeployerCreateFilesystemCalculateChangesTests(
         )
 
         # Give it a configuration that says there should be a manifestation.
-        node_config = to_node(self.ONE_DATASET_STATE)
+        node_config = self.ONE_DATASET_CONFIG
 
         assert_calculated_changes(
             self, node_state, node_config,
@@ -2656,7 +2658,7 @@ class BlockDeviceDeployerUnmountCalculateChangesTests(
 
         # Give it a configuration that says it shouldn't have that
         # manifestation.
-        node_config = to_node(self.ONE_DATASET_STATE).transform(
+        node_config = self.ONE_DATASET_CONFIG.transform(
             ["manifestations", unicode(self.DATASET_ID)], discard
         )
 
@@ -2680,7 +2682,7 @@ class BlockDeviceDeployerUnmountCalculateChangesTests(
 
         # Give it a configuration that says it shouldn't have that
         # manifestation.
-        node_config = to_node(self.ONE_DATASET_STATE).transform(
+        node_config = self.ONE_DATASET_CONFIG.transform(
             ["manifestations", unicode(self.DATASET_ID),
              "dataset", "deleted"], True,
         )
@@ -2703,7 +2705,7 @@ class BlockDeviceDeployerUnmountCalculateChangesTests(
 
         # Give it a configuration that says it shouldn't have that
         # manifestation.
-        node_config = to_node(self.ONE_DATASET_STATE).transform(
+        node_config = self.ONE_DATASET_CONFIG.transform(
             ["manifestations", unicode(self.DATASET_ID)], discard
         )
 
@@ -2724,7 +2726,7 @@ class BlockDeviceDeployerUnmountCalculateChangesTests(
 
         # Give it a configuration that says it shouldn't have that
         # manifestation.
-        node_config = to_node(self.ONE_DATASET_STATE).transform(
+        node_config = self.ONE_DATASET_CONFIG.transform(
             ["manifestations", unicode(self.DATASET_ID)], discard
         )
 
@@ -2748,7 +2750,7 @@ class BlockDeviceDeployerUnmountCalculateChangesTests(
 
         # Give it a configuration that says it shouldn't have that
         # manifestation.
-        node_config = to_node(self.ONE_DATASET_STATE).transform(
+        node_config = self.ONE_DATASET_CONFIG.transform(
             ["manifestations", unicode(self.DATASET_ID)], discard
         )
 
@@ -2792,8 +2794,8 @@ class BlockDeviceDeployerCreationCalculateChangesTests(
             }
         )
         state = DeploymentState(nodes=[])
-        deployer = create_blockdevicedeployer(
-            self, hostname=node, node_uuid=node_uuid
+        deployer = BlockDeviceDeployer(
+            hostname=node, node_uuid=node_uuid, block_device_api=UnusableAPI(),
         )
         local_state = local_state_from_shared_state(
             node_state=state.get_node(node_uuid, hostname=node),
@@ -2828,8 +2830,8 @@ class BlockDeviceDeployerCreationCalculateChangesTests(
         state = DeploymentState(nodes=[NodeState(
             uuid=uuid, hostname=node, applications=None, manifestations={},
             devices={}, paths={})])
-        deployer = create_blockdevicedeployer(
-            self, hostname=node, node_uuid=uuid,
+        deployer = BlockDeviceDeployer(
+            hostname=node, node_uuid=uuid, block_device_api=UnusableAPI(),
         )
         local_state = local_state_from_shared_state(
             node_state=state.get_node(uuid),
@@ -2872,8 +2874,8 @@ class BlockDeviceDeployerCreationCalculateChangesTests(
         state = DeploymentState(nodes=[NodeState(
             uuid=uuid, hostname=node, applications=None, manifestations={},
             devices={}, paths={})])
-        deployer = create_blockdevicedeployer(
-            self, hostname=node, node_uuid=uuid,
+        deployer = BlockDeviceDeployer(
+            hostname=node, node_uuid=uuid, block_device_api=UnusableAPI(),
         )
         local_state = local_state_from_shared_state(
             node_state=state.get_node(uuid),
@@ -2920,8 +2922,8 @@ class BlockDeviceDeployerCreationCalculateChangesTests(
             uuid=uuid, hostname=node, applications=None, manifestations={},
             devices={}, paths={})
         state = DeploymentState(nodes={node_state})
-        deployer = create_blockdevicedeployer(
-            self, hostname=node, node_uuid=uuid,
+        deployer = BlockDeviceDeployer(
+            hostname=node, node_uuid=uuid, block_device_api=UnusableAPI(),
         )
         local_state = BlockDeviceDeployerLocalState(
             node_uuid=uuid,
@@ -2961,8 +2963,9 @@ class BlockDeviceDeployerCreationCalculateChangesTests(
         # state.
         current_cluster_state = DeploymentState(nodes={local_state})
 
-        deployer = create_blockdevicedeployer(
-            self, node_uuid=local_uuid, hostname=local_hostname,
+        deployer = BlockDeviceDeployer(
+            node_uuid=local_uuid, hostname=local_hostname,
+            block_device_api=UnusableAPI(),
         )
 
         local_state = local_state_from_shared_state(
@@ -2997,7 +3000,7 @@ class BlockDeviceDeployerCreationCalculateChangesTests(
                     primary=True,
                     dataset=Dataset(
                         dataset_id=expected_dataset_id,
-                        maximum_size=int(REALISTIC_BLOCKDEVICE_SIZE.to_Byte()),
+                        maximum_size=REALISTIC_BLOCKDEVICE_SIZE_BYTES,
                         # Dataset state will always have empty metadata and
                         # deleted will always be False.
                         metadata={},
@@ -3117,10 +3120,10 @@ class BlockDeviceDeployerCreationCalculateChangesTests(
         state = DeploymentState(
             nodes={node_state},
         )
-        deployer = create_blockdevicedeployer(
-            self,
+        deployer = BlockDeviceDeployer(
             hostname=node_address,
             node_uuid=node_id,
+            block_device_api=UnusableAPI(),
         )
         local_state = local_state_from_shared_state(
             node_state=node_state,
@@ -3150,7 +3153,7 @@ class BlockDeviceDeployerCreationCalculateChangesTests(
         # The state has a manifestation with a concrete size (as it must have).
         local_state = self.ONE_DATASET_STATE
         # The configuration is the same except it lacks a size.
-        local_config = to_node(local_state).transform(
+        local_config = self.ONE_DATASET_CONFIG.transform(
             ["manifestations", unicode(self.DATASET_ID), "dataset",
              "maximum_size"],
             None,
@@ -3252,18 +3255,18 @@ class BlockDeviceDeployerDetachCalculateChangesTests(
         )
 
         # Give it a configuration that says a dataset should be local:
-        node_config = to_node(self.ONE_DATASET_STATE)
+        node_config = self.ONE_DATASET_CONFIG
 
         assert_calculated_changes(
             self, node_state, node_config,
             {Dataset(dataset_id=unicode(self.DATASET_ID),
-                     maximum_size=int(REALISTIC_BLOCKDEVICE_SIZE.to_Byte()))},
+                     maximum_size=REALISTIC_BLOCKDEVICE_SIZE_BYTES)},
             discovered_datasets=[
                 DiscoveredDataset(
                     state=DatasetStates.ATTACHED_TO_DEAD_NODE,
                     dataset_id=self.DATASET_ID,
                     blockdevice_id=self.BLOCKDEVICE_ID,
-                    maximum_size=int(REALISTIC_BLOCKDEVICE_SIZE.to_Byte()),
+                    maximum_size=REALISTIC_BLOCKDEVICE_SIZE_BYTES,
                 ),
             ],
             expected_changes=in_parallel(changes=[
@@ -3290,20 +3293,20 @@ class BlockDeviceDeployerDetachCalculateChangesTests(
 
         # Give it a configuration suggesting the dataset should be
         # deleted:
-        node_config = to_node(self.ONE_DATASET_STATE).transform(
+        node_config = self.ONE_DATASET_CONFIG.transform(
             ["manifestations", unicode(self.DATASET_ID), "dataset",
              "deleted"], True)
 
         assert_calculated_changes(
             self, node_state, node_config,
             {Dataset(dataset_id=unicode(self.DATASET_ID),
-                     maximum_size=int(REALISTIC_BLOCKDEVICE_SIZE.to_Byte()))},
+                     maximum_size=REALISTIC_BLOCKDEVICE_SIZE_BYTES)},
             discovered_datasets=[
                 DiscoveredDataset(
                     state=DatasetStates.ATTACHED_TO_DEAD_NODE,
                     dataset_id=self.DATASET_ID,
                     blockdevice_id=self.BLOCKDEVICE_ID,
-                    maximum_size=int(REALISTIC_BLOCKDEVICE_SIZE.to_Byte()),
+                    maximum_size=REALISTIC_BLOCKDEVICE_SIZE_BYTES,
                 ),
             ],
             expected_changes=in_parallel(changes=[
@@ -3522,6 +3525,26 @@ def losetup_detach_all(root_path):
             losetup_detach(device_file)
 
 
+class DetachDestroyVolumesTests(TestCase):
+    """
+    Tests for ``detach_destroy_volumes``.
+    """
+    def test_no_sleep_after_cleanup(self):
+        """
+        ``detach_destroy_volumes`` detaches and destroys all volumes and does
+        not sleep once there are none left.
+        """
+        sleeps = []
+        self.patch(time, "sleep", sleeps.append)
+        api = loopbackblockdeviceapi_for_test(self)
+        volume = api.create_volume(
+            dataset_id=uuid4(), size=LOOPBACK_MINIMUM_ALLOCATABLE_SIZE,
+        )
+        api.attach_volume(volume.blockdevice_id, api.compute_instance_id())
+        detach_destroy_volumes(api)
+        self.assertEqual(([], []), (api.list_volumes(), sleeps))
+
+
 class LoopbackBlockDeviceAPITests(
         make_iblockdeviceapi_tests(
             blockdevice_api_factory=partial(
@@ -3629,6 +3652,25 @@ class LoopbackBlockDeviceAPIImplementationTests(TestCase):
         unattached_directory.makedirs()
         self.assertDirectoryStructure(directory)
 
+    def test_detach_releases_device(self):
+        """
+        ``detach_volume`` releases the loopback device which was backed by
+        the volume's file.
+        """
+        volume = self.api.create_volume(
+            dataset_id=uuid4(),
+            size=self.minimum_allocatable_size,
+        )
+        self.api.attach_volume(
+            volume.blockdevice_id, self.api.compute_instance_id(),
+        )
+        device_path = self.api.get_device_path(volume.blockdevice_id)
+        self.api.detach_volume(volume.blockdevice_id)
+        self.assertNotIn(
+            device_path,
+            [device_file for device_file, _ in _losetup_list()],
+        )
+
     def test_create_sparse(self):
         """
         ``create_volume`` creates sparse files.
@@ -3804,6 +3846,64 @@ class LosetupListTests(TestCase):
         )
 
 
+class LosetupListSysfsTests(TestCase):
+    """
+    Tests for ``_losetup_list_sysfs``.
+    """
+    def setUp(self):
+        super(LosetupListSysfsTests, self).setUp()
+        self.sys_block = FilePath(self.mktemp())
+        self.sys_block.makedirs()
+
+    def add_device(self, name, backing_file=None):
+        """
+        Describe a block device in ``sys_block``.
+
+        :param bytes name: The name of the block device.
+        :param bytes backing_file: The content of the device's
+            ``loop/backing_file`` file or ``None`` if the device has none.
+        """
+        device = self.sys_block.child(name)
+        device.makedirs()
+        if backing_file is not None:
+            device.child(b"loop").makedirs()
+            device.descendant([b"loop", b"backing_file"]).setContent(
+                backing_file
+            )
+
+    def test_empty(self):
+        """
+        An empty list is returned if there are no block devices.
+        """
+        self.assertEqual([], _losetup_list_sysfs(self.sys_block))
+
+    def test_backing_files(self):
+        """
+        A pair of FilePaths is returned for every loopback device with a
+        backing file.  Other block devices and unused loopback devices are
+        not listed.
+        """
+        self.add_device(b"loop0", b"/tmp/rjw\n")
+        self.add_device(b"loop1")
+        self.add_device(b"loop2", b"/tmp/other\n")
+        self.add_device(b"sda")
+        self.assertEqual(
+            sorted([(FilePath(b"/dev/loop0"), FilePath(b"/tmp/rjw")),
+                    (FilePath(b"/dev/loop2"), FilePath(b"/tmp/other"))]),
+            sorted(_losetup_list_sysfs(self.sys_block)),
+        )
+
+    def test_remove_deleted_suffix(self):
+        """
+        Devices whose backing files are marked as ``(deleted)`` are listed.
+        """
+        self.add_device(b"loop0", b"/tmp/rjw (deleted)\n")
+        self.assertEqual(
+            [(FilePath(b"/dev/loop0"), FilePath(b"/tmp/rjw"))],
+            _losetup_list_sysfs(self.sys_block),
+        )
+
+
 class FakeProfiledLoopbackBlockDeviceIProfiledBlockDeviceTests(
     make_iprofiledblockdeviceapi_tests(
         partial(fakeprofiledloopbackblockdeviceapi_for_test,
@@ -3819,7 +3919,7 @@ class FakeProfiledLoopbackBlockDeviceIProfiledBlockDeviceTests(
 
 _ARBITRARY_VOLUME = BlockDeviceVolume(
     blockdevice_id=u"abcd",
-    size=int(REALISTIC_BLOCKDEVICE_SIZE.to_Byte()),
+    size=REALISTIC_BLOCKDEVICE_SIZE_BYTES,
     dataset_id=uuid4(),
 )
 
@@ -3,15 +3,14 @@
 """
 Test helpers for ``flocker.node.agents.blockdevice``.
 """
+from ctypes import CDLL, c_char_p, c_ulong, c_void_p, get_errno
 from functools import wraps
-from os import environ
+from os import environ, strerror
 from unittest import SkipTest, skipUnless
-from subprocess import check_output, Popen, PIPE, STDOUT
+from subprocess import check_output
 import time
 from uuid import uuid4
 
-import psutil
-
 import yaml
 from bitmath import GiB
 
@@ -57,6 +56,11 @@ from ...backends import backend_and_api_args_from_configuration
 # approach. So just use this global logger for now.
 _logger = Logger()
 
+# The C library, used to make system calls that would otherwise cost a
+# process spawn.
+_libc = CDLL(None, use_errno=True)
+_libc.mount.argtypes = [c_char_p, c_char_p, c_char_p, c_ulong, c_void_p]
+
 CLEANUP_RETRY_LIMIT = 10
 
 
@@ -65,6 +69,7 @@ def detach_destroy_volumes(api):
     Detach and destroy all volumes known to this API.
     If we failed to detach a volume for any reason,
     sleep for 1 second and retry until we hit CLEANUP_RETRY_LIMIT.
+    No time is spent sleeping once every volume is gone.
     This is to facilitate best effort cleanup of volume
     environment after each test run, so that future runs
     are not impacted.
@@ -82,8 +87,10 @@ def detach_destroy_volumes(api):
                 except:
                     write_traceback(_logger)
 
-            time.sleep(1.0)
             volumes = api.list_volumes()
+            if len(volumes) > 0:
+                time.sleep(1.0)
+                volumes = api.list_volumes()
             retry += 1
 
         if len(volumes) > 0:
@@ -578,16 +585,16 @@ class IBlockDeviceAPITestsMixin(object):
         called with its ``blockdevice_id``.
         """
         def fail_mount(device):
+            # Call mount(2) directly rather than running the ``mount``
+            # binary; only the reason for the failure is of interest.
             mountpoint = FilePath(self.mktemp())
             mountpoint.makedirs()
-            process = Popen(
-                [b"mount", device_path.path, mountpoint.path],
-                stdout=PIPE,
-                stderr=STDOUT
+            result = _libc.mount(
+                device.path, mountpoint.path, b"ext4", 0, None
             )
-            output = process.stdout.read()
-            process.wait()
-            return output
+            if result == 0:
+                return None
+            return strerror(get_errno())
 
         # Create an unrelated, attached volume that should be undisturbed.
         unrelated = self.api.create_volume(
@@ -737,23 +744,42 @@ def umount(unmount_target):
     check_output(['umount', unmount_target.path])
 
 
-def umount_all(root_path):
+def _mountpoints_under(root_path, mountinfo=FilePath(b"/proc/self/mountinfo")):
     """
-    Unmount all devices with mount points contained in ``root_path``.
+    Find the mount points contained in ``root_path``.
 
     :param FilePath root_path: A directory in which to search for mount points.
+    :param FilePath mountinfo: The ``mountinfo`` file of the process whose
+        mount namespace will be searched.
+
+    :return: A ``list`` of mount point paths (``bytes``) in the order the
+        filesystems were mounted.
     """
-    def is_under_root(path):
+    mountpoints = []
+    for line in mountinfo.getContent().splitlines():
+        # The fifth field is the mount point, with whitespace and backslashes
+        # escaped as octal sequences.
+        mountpoint = line.split(b" ")[4].decode("string_escape")
         try:
-            FilePath(path).segmentsFrom(root_path)
+            FilePath(mountpoint).segmentsFrom(root_path)
         except ValueError:
-            return False
-        return True
+            continue
+        mountpoints.append(mountpoint)
+    return mountpoints
+
 
-    partitions_under_root = list(p for p in psutil.disk_partitions()
-                                 if is_under_root(p.mountpoint))
-    for partition in partitions_under_root:
-        umount(FilePath(partition.mountpoint))
+def umount_all(root_path):
+    """
+    Unmount all filesystems with mount points contained in ``root_path``.
+
+    :param FilePath root_path: A directory in which to search for mount points.
+    """
+    mountpoints_under_root = _mountpoints_under(root_path)
+    if mountpoints_under_root:
+        # umount accepts several targets, so unmount them all at once.  Go
+        # from the most recent mount backwards so nested mounts are removed
+        # before the filesystems they are mounted on.
+        check_output(['umount'] + mountpoints_under_root[::-1])
 
 
 def mountroot_for_test(test_case):
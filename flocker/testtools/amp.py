@@ -5,6 +5,8 @@
 Fakes for interacting with AMP.
 """
 
+from collections import deque
+
 from twisted.python.failure import Failure
 from twisted.internet.defer import Deferred, succeed
 from twisted.internet.error import ConnectionLost
@@ -110,12 +112,13 @@ class DelayedAMPClient(object):
     A wrapper for ``FakeAMPClient`` that allows responses to be delayed.
 
     :ivar _client: The underlying AMP client.
-    :ivar _calls: List of tuples of deferred and response.
+    :ivar _calls: ``deque`` of tuples of deferred and response, oldest
+        first.
     """
 
     def __init__(self, client):
         self._client = client
-        self._calls = []
+        self._calls = deque()
         self.transport = StringTransport()
 
     def callRemote(self, command, **kwargs):
@@ -138,8 +141,10 @@ class DelayedAMPClient(object):
     def respond(self):
         """
         Respond to the oldest outstanding remote call.
+
+        :raise IndexError: If there are no outstanding remote calls.
         """
-        d, response = self._calls.pop(0)
+        d, response = self._calls.popleft()
         response.chainDeferred(d)
 
 